@@ -8,7 +8,9 @@ import difflib
 AIRBNB_JSON_PATH = Path("../data/processed/cities_statistical_data.json")
 EUROSTAT_XLSX_PATH = Path("../data/raw/rentals/rentals_data.xlsx")
 OUT_CITIES_JSON = Path("../data/processed/cities_affordability_2023.json")
+OUT_BY_YEAR_JSON = Path("../data/processed/cities_affordability_by_year.json")
 
+# Year written to OUT_CITIES_JSON (used by the site); all years go to OUT_BY_YEAR_JSON
 YEAR = "2023"
 NIGHTS_PER_MONTH = 30
 
@@ -48,7 +50,8 @@ def normalize_place(name: str) -> str:
     name = MANUAL_CITY_MAP.get(name, name)
     return name
 
-def parse_eurostat_sheet(xlsx_path: Path, sheet_name: str, year: str) -> pd.DataFrame:
+def parse_eurostat_sheet(xlsx_path: Path, sheet_name: str) -> pd.DataFrame:
+    """Parse every year of a Eurostat sheet into long format (city, year, rent)."""
     df = pd.read_excel(xlsx_path, sheet_name=sheet_name)
     first_col = df.columns[0]
     time_row_idx_list = df.index[df[first_col].astype(str).str.strip() == "TIME"].tolist()
@@ -61,6 +64,8 @@ def parse_eurostat_sheet(xlsx_path: Path, sheet_name: str, year: str) -> pd.Data
         val = time_row[col]
         if isinstance(val, str) and val.strip().isdigit():
             col_to_year[col] = val.strip()
+    if not col_to_year:
+        raise RuntimeError(f"Sheet '{sheet_name}': no year columns found.")
     geo_row_idx_list = df.index[df[first_col].astype(str).str.contains("GEO", na=False)].tolist()
     if not geo_row_idx_list:
         raise RuntimeError(f"Sheet '{sheet_name}': can't find GEO row.")
@@ -69,9 +74,7 @@ def parse_eurostat_sheet(xlsx_path: Path, sheet_name: str, year: str) -> pd.Data
     data_df = df.iloc[data_start:].copy()
     data_df = data_df.rename(columns={first_col: "city_label"})
     data_df["city_label"] = data_df["city_label"].astype(str).str.strip()
-    year_cols = [col for col, y in col_to_year.items() if y == year]
-    if not year_cols:
-        raise RuntimeError(f"Sheet '{sheet_name}': year {year} not found.")
+    data_df = data_df[data_df["city_label"].notna() & (data_df["city_label"] != "nan")].copy()
     def to_number(x):
         if pd.isna(x):
             return None
@@ -87,41 +90,42 @@ def parse_eurostat_sheet(xlsx_path: Path, sheet_name: str, year: str) -> pd.Data
         if isinstance(x, (int, float)):
             return float(x)
         return None
-    values = []
-    for _, r in data_df.iterrows():
-        found = None
-        for col in year_cols:
-            v = to_number(r.get(col))
-            if v is not None:
-                found = v
-                break
-        values.append(found)
-    out = pd.DataFrame({
-        "city_label": data_df["city_label"].values,
-        "rent_eur_month": values,
-    })
-    out = out[out["city_label"].notna() & (out["city_label"] != "nan")].copy()
+    # All year columns at once: one row per (sheet row, year column)
+    data_df["row"] = range(len(data_df))
+    long = data_df.melt(
+        id_vars=["row", "city_label"],
+        value_vars=list(col_to_year),
+        var_name="col",
+        value_name="rent_eur_month",
+    )
+    long["year"] = long["col"].map(col_to_year)
+    long["rent_eur_month"] = pd.to_numeric(long["rent_eur_month"].map(to_number), errors="coerce")
+    long = long[long["rent_eur_month"].notna()]
+    # If a year has several columns, keep the first one with a value
+    long["col_pos"] = long["col"].map({col: i for i, col in enumerate(df.columns)})
+    long = long.sort_values(["year", "row", "col_pos"]).drop_duplicates(["row", "year"])
+    out = long[["city_label", "year", "rent_eur_month"]].reset_index(drop=True)
     out["city_norm"] = out["city_label"].apply(normalize_place)
-    out = out[out["rent_eur_month"].notna()].copy()
     return out
 
-def build_rent_table_2023(xlsx_path: Path) -> pd.DataFrame:
-    rent_1bed = parse_eurostat_sheet(xlsx_path, "Sheet 5", YEAR).rename(
+def build_rent_table(xlsx_path: Path) -> pd.DataFrame:
+    """Rents for every year in the sheets, one row per (city_norm, year)."""
+    rent_1bed = parse_eurostat_sheet(xlsx_path, "Sheet 5").rename(
         columns={"rent_eur_month": "rent_1bed_month"}
     )
-    rent_non_detached = parse_eurostat_sheet(xlsx_path, "Sheet 1", YEAR).rename(
+    rent_non_detached = parse_eurostat_sheet(xlsx_path, "Sheet 1").rename(
         columns={"rent_eur_month": "rent_house_non_detached_month"}
     )
-    rent_detached = parse_eurostat_sheet(xlsx_path, "Sheet 2", YEAR).rename(
+    rent_detached = parse_eurostat_sheet(xlsx_path, "Sheet 2").rename(
         columns={"rent_eur_month": "rent_house_detached_month"}
     )
-    rents = rent_1bed[["city_norm", "city_label", "rent_1bed_month"]].merge(
-        rent_non_detached[["city_norm", "rent_house_non_detached_month"]],
-        on="city_norm",
+    rents = rent_1bed[["city_norm", "year", "city_label", "rent_1bed_month"]].merge(
+        rent_non_detached[["city_norm", "year", "rent_house_non_detached_month"]],
+        on=["city_norm", "year"],
         how="outer",
     ).merge(
-        rent_detached[["city_norm", "rent_house_detached_month"]],
-        on="city_norm",
+        rent_detached[["city_norm", "year", "rent_house_detached_month"]],
+        on=["city_norm", "year"],
         how="outer",
     )
     # Only need rent_1bed_month and rent_house_detached_month for output
@@ -140,19 +144,14 @@ def fuzzy_match_city(city_norm: str, rent_choices: list[str], cutoff: float = 0.
         return None
     return matches[0]
 
-def main():
-    OUT_CITIES_JSON.parent.mkdir(parents=True, exist_ok=True)
-    airbnb = pd.read_json(AIRBNB_JSON_PATH)
-    airbnb["city_norm"] = airbnb["city"].apply(normalize_place)
-    airbnb["is_region"] = airbnb["city_norm"].isin(REGIONS)
-    rents = build_rent_table_2023(EUROSTAT_XLSX_PATH)
-    rent_choices = rents["city_norm"].dropna().unique().tolist()
-    cities_only = airbnb[~airbnb["is_region"]].copy()
+def affordability_rows(cities_only: pd.DataFrame, matches: dict, rents_year: pd.DataFrame) -> list[dict]:
+    # First rent row per matched city for this year
+    rents_year = rents_year.drop_duplicates("city_norm").set_index("city_norm")
     result_rows = []
     for _, r in cities_only.iterrows():
-        match = fuzzy_match_city(r["city_norm"], rent_choices)
-        if match is not None:
-            rent_row = rents[rents["city_norm"] == match].iloc[0]
+        match = matches.get(r["city"])
+        if match is not None and match in rents_year.index:
+            rent_row = rents_year.loc[match]
             # Only include if all required rents and prices are present
             rent_1bed = rent_row.get("rent_1bed_month")
             rent_detached = rent_row.get("rent_house_detached_month")
@@ -175,7 +174,24 @@ def main():
                     "affordability_private_room_vs_1bed_rent": aff_private_vs_rent,
                     "affordability_entire_home_vs_house_rent": aff_entire_vs_house,
                 })
-    OUT_CITIES_JSON.write_text(json.dumps(result_rows, ensure_ascii=False, indent=2), encoding="utf-8")
+    return result_rows
+
+def main():
+    OUT_CITIES_JSON.parent.mkdir(parents=True, exist_ok=True)
+    airbnb = pd.read_json(AIRBNB_JSON_PATH)
+    airbnb["city_norm"] = airbnb["city"].apply(normalize_place)
+    airbnb["is_region"] = airbnb["city_norm"].isin(REGIONS)
+    rents = build_rent_table(EUROSTAT_XLSX_PATH)
+    cities_only = airbnb[~airbnb["is_region"]].copy()
+    # Fuzzy match once per city, against every name that has a rent in any year
+    rent_choices = rents["city_norm"].dropna().unique().tolist()
+    matches = {r["city"]: fuzzy_match_city(r["city_norm"], rent_choices) for _, r in cities_only.iterrows()}
+    by_year = {
+        year: affordability_rows(cities_only, matches, rents_year)
+        for year, rents_year in rents.groupby("year", sort=True)
+    }
+    OUT_BY_YEAR_JSON.write_text(json.dumps(by_year, ensure_ascii=False, indent=2), encoding="utf-8")
+    OUT_CITIES_JSON.write_text(json.dumps(by_year.get(YEAR, []), ensure_ascii=False, indent=2), encoding="utf-8")
 
 if __name__ == "__main__":
     main()
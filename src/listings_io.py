@@ -0,0 +1,97 @@
+"""
+Readers for Inside Airbnb listing files.
+
+Inside Airbnb ships listings as `listings.csv.gz`. Instead of unpacking every
+city to disk first, compressed files are decompressed in a background thread
+and streamed straight into the CSV parser, so decompression and parsing overlap.
+"""
+
+import gzip
+import io
+import queue
+import threading
+from pathlib import Path
+
+import pandas as pd
+
+CHUNK_SIZE = 1 << 20   # 1 MB of decompressed data per chunk
+MAX_CHUNKS = 8         # how far the decompression thread may run ahead
+
+_EOF = object()
+
+
+class _ThreadedGzipStream(io.RawIOBase):
+    """Read-only stream fed by a thread that decompresses a .gz file."""
+
+    def __init__(self, path: Path):
+        self._chunks = queue.Queue(maxsize=MAX_CHUNKS)
+        self._buffer = memoryview(b"")
+        self._done = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._decompress, args=(path,), daemon=True)
+        self._thread.start()
+
+    def _put(self, item) -> bool:
+        # Block while the queue is full, but give up if the reader was closed
+        while not self._stop.is_set():
+            try:
+                self._chunks.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _decompress(self, path: Path):
+        try:
+            with gzip.open(path, "rb") as f:
+                while True:
+                    chunk = f.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    if not self._put(chunk):
+                        return
+        except Exception as e:
+            self._put(e)
+            return
+        self._put(_EOF)
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        while not self._buffer and not self._done:
+            item = self._chunks.get()
+            if item is _EOF:
+                self._done = True
+            elif isinstance(item, Exception):
+                self._done = True
+                raise item
+            else:
+                self._buffer = memoryview(item)
+        n = min(len(b), len(self._buffer))
+        b[:n] = self._buffer[:n]
+        self._buffer = self._buffer[n:]
+        return n
+
+    def close(self):
+        self._stop.set()
+        super().close()
+
+
+def resolve_listings_path(raw_dir: Path, filename: str) -> Path:
+    """Return `raw_dir / filename`, falling back to its `.gz` sibling if only that exists."""
+    path = Path(raw_dir) / filename
+    if not path.exists() and path.suffix != ".gz":
+        gz_path = path.with_name(path.name + ".gz")
+        if gz_path.exists():
+            return gz_path
+    return path
+
+
+def read_listings(path, **kwargs) -> pd.DataFrame:
+    """Read a listings CSV, streaming `.gz` files through a background decompressor."""
+    path = Path(path)
+    if path.suffix != ".gz":
+        return pd.read_csv(path, **kwargs)
+    with io.BufferedReader(_ThreadedGzipStream(path), buffer_size=CHUNK_SIZE) as stream:
+        return pd.read_csv(stream, **kwargs)
@@ -1,6 +1,8 @@
 import pandas as pd
 import os
 
+from listings_io import read_listings, resolve_listings_path
+
 CITIES = [
     ("amsterdam", "data/raw/full_listings/amsterdam.csv", "data/processed/amsterdam_timeline_points.csv"),
     ("barcelona", "data/raw/full_listings/barcelona.csv", "data/processed/barcelona_timeline_points.csv"),
@@ -9,11 +11,12 @@ CITIES = [
 ]
 
 for city, in_csv, out_csv in CITIES:
+    in_csv = str(resolve_listings_path(os.path.dirname(in_csv), os.path.basename(in_csv)))
     if not os.path.exists(in_csv):
         print(f"WARNING: Input file for {city} does not exist: {in_csv}")
         continue
 
-    df = pd.read_csv(in_csv, low_memory=False)
+    df = read_listings(in_csv, low_memory=False)
 
     # first_review -> year (proxy start)
     df["first_review"] = pd.to_datetime(df["first_review"], errors="coerce")
@@ -0,0 +1,164 @@
+"""
+Precompute density rasters for the city heatmaps.
+Each city's listings are binned into a 2D histogram, smoothed with a
+separable Gaussian blur and written as a small RGBA PNG, so the front end
+can draw a ready-made L.imageOverlay instead of running density estimation
+on every point in the browser.
+"""
+
+import json
+import struct
+import zlib
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Small per-city files made by make_smaller_listings.py
+IN_DIR = Path("data/processed/heatmaps")
+
+# Where the rasters + index go
+OUT_DIR = Path("data/processed/heatmaps/rasters")
+OUT_DIR.mkdir(parents=True, exist_ok=True)
+
+CITIES = [
+    'london',
+    'paris',
+    'rome',
+    'istanbul',
+    'madrid',
+    'barcelona',
+    'lisbon',
+    'amsterdam'
+]
+
+GRID_SIZE = 256          # cells along the longer side of the raster
+SIGMA_CELLS = 2.5        # Gaussian blur radius, in cells
+BOUNDS_QUANTILE = 0.005  # trim this share of outliers on each side of the bounds
+CLIP_QUANTILE = 0.995    # densities above this quantile are drawn at full colour
+HEAT_RGB = (255, 90, 95) # Airbnb red
+
+
+def grid_bounds(lat, lng):
+    """Bounds that ignore stray points far away from the city."""
+    south, north = np.quantile(lat, [BOUNDS_QUANTILE, 1 - BOUNDS_QUANTILE])
+    west, east = np.quantile(lng, [BOUNDS_QUANTILE, 1 - BOUNDS_QUANTILE])
+    return float(south), float(west), float(north), float(east)
+
+
+def grid_shape(south, west, north, east):
+    """(rows, cols) so that cells are roughly square on the ground."""
+    height = north - south
+    width = (east - west) * np.cos(np.radians((north + south) / 2))
+    if height >= width:
+        return GRID_SIZE, max(1, round(GRID_SIZE * width / height))
+    return max(1, round(GRID_SIZE * height / width)), GRID_SIZE
+
+
+def gaussian_kernel(sigma):
+    radius = int(np.ceil(3 * sigma))
+    x = np.arange(-radius, radius + 1)
+    kernel = np.exp(-0.5 * (x / sigma) ** 2)
+    return kernel / kernel.sum()
+
+
+def blur_axis(grid, kernel, axis):
+    """Convolve every row (or column) with the same 1D kernel at once."""
+    radius = len(kernel) // 2
+    pad = [(0, 0), (0, 0)]
+    pad[axis] = (radius, radius)
+    padded = np.pad(grid, pad)
+    windows = np.lib.stride_tricks.sliding_window_view(padded, len(kernel), axis=axis)
+    return windows @ kernel
+
+
+def density_grid(lat, lng, weights, bounds):
+    south, west, north, east = bounds
+    rows, cols = grid_shape(*bounds)
+    hist, _, _ = np.histogram2d(
+        lat, lng,
+        bins=(rows, cols),
+        range=((south, north), (west, east)),
+        weights=weights,
+    )
+    kernel = gaussian_kernel(SIGMA_CELLS)
+    smoothed = blur_axis(blur_axis(hist, kernel, axis=0), kernel, axis=1)
+    # histogram rows go south -> north, image rows go north -> south
+    return smoothed[::-1]
+
+
+def quantize(grid):
+    """Scale densities to 0-255; returns the bytes and the density drawn as 255."""
+    positive = grid[grid > 0]
+    vmax = float(np.quantile(positive, CLIP_QUANTILE)) if positive.size else 0.0
+    if vmax <= 0:
+        return np.zeros(grid.shape, dtype=np.uint8), 0.0
+    scaled = np.clip(grid / vmax, 0, 1)
+    return np.round(scaled * 255).astype(np.uint8), vmax
+
+
+def write_png(path, alpha):
+    """Write a single-colour RGBA PNG whose alpha channel is the density."""
+    rows, cols = alpha.shape
+    rgba = np.empty((rows, cols, 4), dtype=np.uint8)
+    rgba[..., :3] = HEAT_RGB
+    rgba[..., 3] = alpha
+    # every scanline starts with filter type 0 (none)
+    raw = np.concatenate([np.zeros((rows, 1), dtype=np.uint8), rgba.reshape(rows, -1)], axis=1)
+
+    def chunk(tag, data):
+        body = tag + data
+        return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body))
+
+    header = struct.pack(">IIBBBBB", cols, rows, 8, 6, 0, 0, 0)
+    png = (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", header)
+        + chunk(b"IDAT", zlib.compress(raw.tobytes(), 9))
+        + chunk(b"IEND", b"")
+    )
+    path.write_bytes(png)
+
+
+print("Creating density rasters...\n")
+
+index = []
+
+for city in CITIES:
+    input_file = IN_DIR / f"{city}_heatmap.csv"
+
+    if not input_file.exists():
+        print(f"❌ {city}_heatmap.csv not found - skipping")
+        continue
+
+    df = pd.read_csv(input_file, usecols=['latitude', 'longitude', 'price'])
+    df = df.dropna(subset=['latitude', 'longitude'])
+    lat = df['latitude'].to_numpy()
+    lng = df['longitude'].to_numpy()
+    bounds = grid_bounds(lat, lng)
+    south, west, north, east = bounds
+
+    # Plain listing density, and the same weighted by nightly price
+    price = df['price'].fillna(0).clip(lower=0).to_numpy()
+    for kind, weights in [("density", None), ("price", price)]:
+        alpha, vmax = quantize(density_grid(lat, lng, weights, bounds))
+        output_file = OUT_DIR / f"{city}_{kind}.png"
+        write_png(output_file, alpha)
+
+        index.append({
+            "id": city,
+            "kind": kind,
+            "image": output_file.name,
+            # Leaflet order: [[south, west], [north, east]]
+            "bounds": [[south, west], [north, east]],
+            "width": alpha.shape[1],
+            "height": alpha.shape[0],
+            "max_value": vmax,
+        })
+
+    print(f"✅ {city:12} {alpha.shape[1]}×{alpha.shape[0]} raster from {len(df):,} listings")
+
+with open(OUT_DIR / "rasters.json", "w") as f:
+    json.dump(index, f, indent=2)
+
+print(f"\n✅ Done! Rasters saved to: {OUT_DIR}")
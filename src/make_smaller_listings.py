@@ -6,6 +6,8 @@ This should make files WAY smaller
 import pandas as pd
 from pathlib import Path
 
+from listings_io import read_listings, resolve_listings_path
+
 # Where your big CSV files are
 RAW_DIR = Path("data/raw/listings")
 
@@ -28,16 +30,17 @@ CITIES = [
 print("Creating small files with only needed columns...\n")
 
 for city in CITIES:
-    input_file = RAW_DIR / f"{city}.csv"
+    # Accepts {city}.csv or the compressed {city}.csv.gz from Inside Airbnb
+    input_file = resolve_listings_path(RAW_DIR, f"{city}.csv")
     output_file = OUT_DIR / f"{city}_heatmap.csv"
     
     if not input_file.exists():
-        print(f"❌ {city}.csv not found - skipping")
+        print(f"❌ {city}.csv(.gz) not found - skipping")
         continue
     
     try:
         # Read ONLY the 5 columns we need
-        df = pd.read_csv(
+        df = read_listings(
             input_file, 
             usecols=['latitude', 'longitude', 'price', 'room_type', 'name']
         )
@@ -0,0 +1,132 @@
+"""
+City x room type x price bucket summary cube.
+
+Every raw listings file is scanned once and reduced to a few small arrays of
+shape (city, room_type, price_bucket):
+
+    count        listings in the cell
+    price_sum    sum of nightly prices in EUR (0 in the "no price" bucket)
+    lat_sum      sum of latitudes (listings without one are skipped)
+    lat_count    listings with a latitude
+    lng_sum      sum of longitudes (listings without one are skipped)
+    lng_count    listings with a longitude
+
+City-level statistics (averages, price histograms, centres, ...) can then be
+derived from the cube without rereading the raw listings.
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOM_TYPES = ["Entire home/apt", "Private room", "Shared room", "Hotel room", "Other"]
+
+# Lower edges of the price buckets in EUR/night; the last bucket is open-ended
+PRICE_EDGES = np.array(
+    [0, 25, 50, 75, 100, 125, 150, 175, 200, 250, 300, 400, 500, 750, 1000, 2000],
+    dtype=float,
+)
+N_PRICE_BUCKETS = len(PRICE_EDGES) + 1  # + one bucket for listings without a price
+NO_PRICE = N_PRICE_BUCKETS - 1
+
+ARRAYS = ["count", "price_sum", "lat_sum", "lat_count", "lng_sum", "lng_count"]
+
+
+def build_city_cube(df: pd.DataFrame, conversion_rate: float) -> dict:
+    """Reduce one city's listings to (room_type, price_bucket) arrays.
+
+    Expects `price` already cleaned to numeric nightly prices in the local currency.
+    """
+    price_eur = df["price"].to_numpy(dtype=float) * conversion_rate
+    has_price = ~np.isnan(price_eur)
+
+    bucket = np.full(len(df), NO_PRICE)
+    bucket[has_price] = np.clip(
+        np.searchsorted(PRICE_EDGES, price_eur[has_price], side="right") - 1,
+        0, len(PRICE_EDGES) - 1,
+    )
+
+    if "room_type" in df.columns:
+        room = pd.Categorical(df["room_type"], categories=ROOM_TYPES[:-1]).codes
+        room = np.where(room < 0, len(ROOM_TYPES) - 1, room)
+    else:
+        room = np.full(len(df), len(ROOM_TYPES) - 1)
+
+    lat = df["latitude"].to_numpy(dtype=float)
+    lng = df["longitude"].to_numpy(dtype=float)
+    has_lat = ~np.isnan(lat)
+    has_lng = ~np.isnan(lng)
+
+    # One bincount per array over the flattened (room_type, price_bucket) index
+    cell = room * N_PRICE_BUCKETS + bucket
+    size = len(ROOM_TYPES) * N_PRICE_BUCKETS
+    shape = (len(ROOM_TYPES), N_PRICE_BUCKETS)
+
+    def total(weights=None):
+        return np.bincount(cell, weights=weights, minlength=size).reshape(shape)
+
+    return {
+        "count": total().astype(np.int64),
+        "price_sum": total(np.where(has_price, price_eur, 0.0)),
+        "lat_sum": total(np.where(has_lat, lat, 0.0)),
+        "lat_count": total(has_lat.astype(float)).astype(np.int64),
+        "lng_sum": total(np.where(has_lng, lng, 0.0)),
+        "lng_count": total(has_lng.astype(float)).astype(np.int64),
+    }
+
+
+def stack_cube(cities: list[dict], city_cubes: list[dict]) -> dict:
+    """Stack per-city cubes into one cube labelled with the cities' id/city/country."""
+    return {
+        "ids": np.array([c["id"] for c in cities]),
+        "cities": np.array([c["city"] for c in cities]),
+        "countries": np.array([c["country"] for c in cities]),
+        "room_types": np.array(ROOM_TYPES),
+        "price_edges": PRICE_EDGES,
+        **{name: np.stack([cube[name] for cube in city_cubes]) for name in ARRAYS},
+    }
+
+
+def save_cube(path: Path, cube: dict):
+    np.savez_compressed(path, **cube)
+
+
+def load_cube(path: Path) -> dict:
+    with np.load(path) as data:
+        return {key: data[key] for key in data.files}
+
+
+def _mean(total, n):
+    return None if n == 0 else float(total / n)
+
+
+def city_stats(cube: dict, i: int) -> dict:
+    """The fields of cities_statistical_data.json for city `i`, derived from the cube."""
+    priced = slice(0, NO_PRICE)
+    room_types = list(cube["room_types"])
+    entire = room_types.index("Entire home/apt")
+    private = room_types.index("Private room")
+
+    count = cube["count"][i]
+    price_sum = cube["price_sum"][i]
+
+    return {
+        "id": str(cube["ids"][i]),
+        "country": str(cube["countries"][i]),
+        "city": str(cube["cities"][i]),
+        "avg_price": _mean(price_sum.sum(), count[:, priced].sum()),
+        "avg_price_entire_home": _mean(price_sum[entire].sum(), count[entire, priced].sum()),
+        "avg_price_private_room": _mean(price_sum[private].sum(), count[private, priced].sum()),
+        "count": int(count.sum()),
+        "lat": _mean(cube["lat_sum"][i].sum(), cube["lat_count"][i].sum()),
+        "lng": _mean(cube["lng_sum"][i].sum(), cube["lng_count"][i].sum()),
+    }
+
+
+def price_histogram(cube: dict, i: int, room_type: str | None = None) -> list[int]:
+    """Listing counts per price bucket for city `i`, optionally for one room type."""
+    count = cube["count"][i]
+    if room_type is not None:
+        count = count[list(cube["room_types"]).index(room_type)][None, :]
+    return count[:, :NO_PRICE].sum(axis=0).tolist()